@@ -1,9 +1,28 @@
+import os
+import hashlib
 import pandas as pd
 import numpy as np
-from .utils import convert_time_to_seconds, convert_seconds_to_time_str
+import streamlit as st
+from .utils import convert_time_to_seconds_series, convert_seconds_to_time_str
+
+DNF_STATUS_IDS = frozenset({
+    1, 2, 11, 12, 13, 14, 15, 16, 17, 18, 19, 45, 50, 128, 53, 55, 58, 88,
+    111,112,113,114,115,116,117,118,119,120,122,123,124,125,127,133,134
+})
+
+# results columns build_driver_table reads; everything else is dropped before the join
+DRIVER_TABLE_RESULT_COLS = [
+    'raceId', 'driverId', 'grid', 'positionOrder', 'time', 'milliseconds',
+    'fastestLapTime', 'fastestLapSpeed', 'fastestLap', 'statusId',
+]
+
+# on-disk cache for precomputed driver tables (see build_driver_table); bump the
+# version whenever the table-building code changes so old parquet files are ignored
+DRIVER_TABLE_CACHE_DIR = os.path.join("data", "cache")
+DRIVER_TABLE_CACHE_VERSION = 2
 
 # -----------------------------------------------------------
-# GAP CALCULATION (use robust logic from old version)
+# GAP CALCULATION (vectorized across races)
 # -----------------------------------------------------------
 def add_position_gaps(df_results: pd.DataFrame) -> pd.DataFrame:
     """
@@ -12,61 +31,110 @@ def add_position_gaps(df_results: pd.DataFrame) -> pd.DataFrame:
       - gap_to_next_s:   gap to car behind (next finisher). NaN for last car.
     Uses '+…' gap strings in 'time' if present, else falls back to milliseconds.
     """
-    use_cols = ['raceId', 'driverId', 'positionOrder', 'time', 'milliseconds']
-    g = df_results[use_cols].copy()
-
-    g['positionOrder']    = pd.to_numeric(g['positionOrder'], errors='coerce')
-    g['milliseconds_num'] = pd.to_numeric(g['milliseconds'], errors='coerce')
-
-    def compute_for_race(gr):
-        gr = gr.sort_values('positionOrder').copy()
-        win_ms_series = gr.loc[gr['positionOrder'] == 1, 'milliseconds_num']
-        win_ms = win_ms_series.iloc[0] if not win_ms_series.empty else np.nan
+    race = df_results['raceId'].to_numpy()
+    pos  = pd.to_numeric(df_results['positionOrder'], errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+    ms   = pd.to_numeric(df_results['milliseconds'], errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+    is_plus = df_results['time'].astype('string').str.strip().str.startswith('+', na=False).to_numpy(dtype=bool)
+    plus_s  = convert_time_to_seconds_series(df_results['time']).to_numpy()
+
+    # one stable sort by (raceId, positionOrder); race boundaries become flag arrays,
+    # so every per-race step below is a flat numpy pass (no groupby)
+    order = np.lexsort((pos, race))
+    race_s, pos_s, ms_s = race[order], pos[order], ms[order]
+    n = len(order)
+    first = np.ones(n, dtype=bool)
+    first[1:] = race_s[1:] != race_s[:-1]
+    last = np.ones(n, dtype=bool)
+    last[:-1] = first[1:]
+    race_no = np.cumsum(first) - 1
+
+    # winner ms broadcast to every row of its race
+    win_ms = np.fmin.reduceat(np.where(pos_s == 1, ms_s, np.nan), np.flatnonzero(first))[race_no] if n else ms_s
+
+    # ms-derived gap, then winner fallback, then overlay '+…' gap strings
+    gap = np.maximum((ms_s - win_ms) / 1000.0, 0.0)
+    gap = np.where(np.isnan(gap) & (pos_s == 1), 0.0, gap)
+    plus_sorted = np.where(is_plus[order], plus_s[order], np.nan)
+    gap = np.where(np.isnan(plus_sorted), gap, plus_sorted)
+
+    nxt = np.empty(n)
+    nxt[:-1] = gap[1:]
+    nxt[last] = np.nan
+
+    gap_to_winner = np.empty(n)
+    gap_to_next   = np.empty(n)
+    gap_to_winner[order] = gap
+    gap_to_next[order]   = nxt - gap
+
+    out = df_results.copy()
+    out['gap_to_winner_s'] = gap_to_winner
+    out['gap_to_next_s']   = gap_to_next
+    return out
 
-        def gap_to_win(row):
-            t = row['time']
-            if isinstance(t, str) and t.strip().startswith('+'):
-                sec = convert_time_to_seconds(t)
-                if sec is not None:
-                    return sec
-            if pd.notna(row['milliseconds_num']) and pd.notna(win_ms):
-                return max(0.0, (row['milliseconds_num'] - win_ms) / 1000.0)
-            return 0.0 if row['positionOrder'] == 1 else np.nan
 
-        gr['gap_to_winner_s'] = gr.apply(gap_to_win, axis=1)
-        gr['gap_to_next_s'] = gr['gap_to_winner_s'].shift(-1) - gr['gap_to_winner_s']
-        if len(gr) > 0:
-            gr.iloc[-1, gr.columns.get_loc('gap_to_next_s')] = np.nan
+# -----------------------------------------------------------
+# BUILD DRIVER TABLE (lightweight merge + computed features)
+# -----------------------------------------------------------
+def _driver_table_cache(dfs: dict, min_year: int, wins_only: bool) -> str:
+    """
+    Parquet path for the precomputed driver table, keyed by a hash of the input
+    tables' contents (so filtered or edited inputs never hit another table's file).
+    """
+    h = hashlib.sha1()
+    for k in ('results', 'races', 'drivers', 'status', 'weather'):
+        t = dfs.get(k)
+        if t is not None:
+            h.update(k.encode())
+            h.update(pd.util.hash_pandas_object(t, index=True).to_numpy().tobytes())
+    name = f"driver_table_v{DRIVER_TABLE_CACHE_VERSION}_{min_year}_{int(wins_only)}_{h.hexdigest()[:16]}.parquet"
+    return os.path.join(DRIVER_TABLE_CACHE_DIR, name)
 
-        return gr[['raceId', 'driverId', 'gap_to_winner_s', 'gap_to_next_s']]
 
-    out = g.groupby('raceId', group_keys=False).apply(compute_for_race)
-    return df_results.merge(out, on=['raceId', 'driverId'], how='left')
+def _driver_names(drivers: pd.DataFrame) -> pd.Series:
+    """Full driver names aligned with `drivers` rows (precomputed by load_core_tables when present)."""
+    if 'driver_name' in drivers.columns:
+        return drivers['driver_name']
+    return drivers['forename'].astype(str).str.cat(drivers['surname'].astype(str), sep=' ')
 
 
-# -----------------------------------------------------------
-# BUILD DRIVER TABLE (lightweight merge + computed features)
-# -----------------------------------------------------------
+@st.cache_data(show_spinner=False)
 def build_driver_table(dfs: dict, min_year: int = 2018, wins_only: bool = False) -> pd.DataFrame:
+    """
+    Results since min_year joined with race/driver/status/weather info plus the
+    derived scoring features. Tables are also persisted as parquet under
+    DRIVER_TABLE_CACHE_DIR, keyed by the content of the input tables.
+    """
+    cache_path = _driver_table_cache(dfs, min_year, wins_only)
+    if os.path.exists(cache_path):
+        try:
+            return pd.read_parquet(cache_path)
+        except Exception as e:
+            print(f"[WARN] driver table cache unreadable {cache_path}: {e}")
+
     drivers = dfs['drivers']
     results = dfs['results']
     races   = dfs['races']
     status  = dfs.get('status', pd.DataFrame())     # optional
     weather = dfs.get('weather', pd.DataFrame())    # optional
 
-    races_f = races[races['year'] >= min_year].copy()
-    df = results.merge(races_f[['raceId','year','name','round','date']], on='raceId', how='inner')
+    # push the year filter and column selection down before the join so every later
+    # step only sees recent rows and the columns it uses; small lookups (races,
+    # status, drivers) are joined/mapped by their index
+    races_f = races.loc[races['year'] >= min_year, ['raceId','year','name','round','date']].set_index('raceId')
+    result_cols = [c for c in DRIVER_TABLE_RESULT_COLS if c in results.columns]
+    results_f = results.loc[results['raceId'].isin(races_f.index), result_cols]
+    df = results_f.join(races_f, on='raceId', how='inner')
 
     # base numeric cleaning
     df['grid'] = pd.to_numeric(df['grid'], errors='coerce')
     df['positionOrder'] = pd.to_numeric(df['positionOrder'], errors='coerce')
     df['positions_gained'] = (df['grid'] - df['positionOrder']).fillna(0)
 
-    df['fastestLapTime_s'] = df['fastestLapTime'].apply(convert_time_to_seconds).fillna(0.0)
+    df['fastestLapTime_s'] = convert_time_to_seconds_series(df['fastestLapTime']).fillna(0.0)
     df['fastestLapSpeed']  = pd.to_numeric(df['fastestLapSpeed'], errors='coerce').fillna(0.0)
     df['fastestLap']       = pd.to_numeric(df['fastestLap'], errors='coerce')
 
-    # add gaps (old logic)
+    # add gaps
     df = add_position_gaps(df)
 
     if wins_only:
@@ -74,35 +142,35 @@ def build_driver_table(dfs: dict, min_year: int = 2018, wins_only: bool = False)
 
     # status weight
     if not status.empty and 'statusId' in df.columns and 'statusId' in status.columns:
-        dnf_ids = {
-            1, 2, 11, 12, 13, 14, 15, 16, 17, 18, 19, 45, 50, 128, 53, 55, 58, 88,
-            111,112,113,114,115,116,117,118,119,120,122,123,124,125,127,133,134
-        }
-        status = status[['statusId','status']].copy()
-        df = df.merge(status, on='statusId', how='left')
-        df['status_weight'] = df['statusId'].apply(lambda sid: 0 if pd.isna(sid) or sid in dnf_ids else 1)
+        status_map = status.set_index('statusId')['status']
+        df['status'] = df['statusId'].map(status_map)
+        sid = pd.to_numeric(df['statusId'], errors='coerce')
+        df['status_weight'] = np.where(sid.isna() | sid.isin(DNF_STATUS_IDS), 0, 1).astype(np.int8)
     else:
         df['status_weight'] = 1
 
     # weather bonus (optional)
-    if not weather.empty and {'GP','Date'}.issubset(weather.columns):
-        df = df.merge(weather, left_on=['name','date'], right_on=['GP','Date'], how='left')
+    if {'GP','Date'}.issubset(weather.columns):
+        weather = weather.set_index(['GP','Date'])  # plain frames passed in by callers
+    if not weather.empty and list(weather.index.names) == ['GP','Date']:
+        df = df.join(weather, on=['name','date'])
     for col in ['Precipitation']:
         if col not in df.columns:
             df[col] = np.nan
 
-    def wet_bonus_fn(p):
-        if pd.isna(p): p = 0
-        if 5 <= p < 10:   return 10
-        if 10 <= p < 20:  return 30
-        if 20 <= p < 50:  return 80
-        if p >= 50:       return 100
-        return 0
-    df['wet_bonus'] = df['Precipitation'].apply(wet_bonus_fn)
+    # wet bonus buckets: [5,10) -> 10, [10,20) -> 30, [20,50) -> 80, >=50 -> 100
+    p = pd.to_numeric(df['Precipitation'], errors='coerce').fillna(0).to_numpy()
+    df['wet_bonus'] = np.select([p >= 50, p >= 20, p >= 10, p >= 5], [100, 80, 30, 10], default=0)
 
     # driver name
-    drivers['driver_name'] = drivers['forename'] + ' ' + drivers['surname']
-    df = df.merge(drivers[['driverId','driver_name']], on='driverId', how='left')
+    names = _driver_names(drivers).set_axis(drivers['driverId'])
+    df['driver_name'] = df['driverId'].map(names).astype('category')
+
+    try:
+        os.makedirs(DRIVER_TABLE_CACHE_DIR, exist_ok=True)
+        df.to_parquet(cache_path, compression='zstd')
+    except Exception as e:
+        print(f"[WARN] could not write driver table cache {cache_path}: {e}")
     return df
 
 
@@ -110,8 +178,12 @@ def build_driver_table(dfs: dict, min_year: int = 2018, wins_only: bool = False)
 # TOP RACES FOR DRIVER (old scoring logic, clean return)
 # -----------------------------------------------------------
 def top_races_for_driver(dfs: dict, driver_name: str, n_top: int = 3, min_year: int = 2018, wins_only: bool = False) -> pd.DataFrame:
+    # the full table is shared by every driver (st.cache_data in process, parquet on disk);
+    # this driver's rows are picked by driverId
+    drivers = dfs['drivers']
+    driver_ids = drivers.loc[_driver_names(drivers) == driver_name, 'driverId']
     df = build_driver_table(dfs, min_year=min_year, wins_only=wins_only)
-    df = df[df['driver_name'] == driver_name].copy()
+    df = df[df['driverId'].isin(driver_ids)].copy()
     if df.empty:
         return df
 
@@ -130,19 +202,15 @@ def top_races_for_driver(dfs: dict, driver_name: str, n_top: int = 3, min_year:
         'wet_bonus'        : 1.0
     }
 
-    # compute score
-    df['score'] = (
-        df['positions_gained']   * W['positions_gained'] +
-        df['gap_to_next_s']      * W['gap_to_next_s'] +
-        df['gap_to_winner_s']    * W['gap_to_winner_s'] +
-        df['fastestLapTime_s']   * W['fastestLapTime_s'] +
-        df['fastestLapSpeed']    * W['fastestLapSpeed'] +
-        df['status_weight']      * W['status_weight'] +
-        df['wet_bonus']          * W['wet_bonus']
-    )
+    # compute score as one weighted dot product over the feature columns
+    feat = df[list(W)].to_numpy(dtype=np.float64)
+    df['score'] = feat @ np.fromiter(W.values(), dtype=np.float64, count=len(W))
 
-    # sort by score descending (best performances first)
-    df = df.sort_values('score', ascending=False)
+    # pick the best n_top by score (partial selection, then order just those)
+    scores = df['score'].to_numpy()
+    k = max(0, min(n_top, len(scores)))
+    idx = np.argpartition(-scores, k - 1)[:k] if k else np.empty(0, dtype=np.intp)
+    idx = idx[np.argsort(-scores[idx], kind='stable')]
 
     # return clean top-N table (for Streamlit)
     cols = [
@@ -150,4 +218,4 @@ def top_races_for_driver(dfs: dict, driver_name: str, n_top: int = 3, min_year:
         'gap_to_winner_s','gap_to_next_s','fastestLapTime_s','fastestLapSpeed',
         'wet_bonus','score'
     ]
-    return df[cols].head(n_top).reset_index(drop=True)
+    return df.iloc[idx][cols].reset_index(drop=True)
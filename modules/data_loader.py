@@ -3,16 +3,42 @@ import os
 import os
 import pandas as pd
 import kagglehub
+import streamlit as st
 
 DATASET = "rohanrao/formula-1-world-championship-1950-2020"
 CIRCUITS_GEO_PATH = "data/circuits_geo.csv"
 WEATHER_PATH      = "data/meteorat_2.csv"
 
+# Per-file read options: only the columns the app uses, with compact dtypes
+# (int32 join keys, categories for repeated strings).
+# Files without an entry are read whole.
+CSV_SCHEMAS = {
+    "results.csv": {
+        "usecols": ['raceId', 'driverId', 'grid', 'positionOrder', 'milliseconds', 'time',
+                    'fastestLapTime', 'fastestLapSpeed', 'fastestLap', 'statusId'],
+        "dtype": {'raceId': 'int32', 'driverId': 'int32', 'grid': 'Int16',
+                  'positionOrder': 'Int16', 'statusId': 'Int16', 'fastestLapSpeed': 'float32'},
+        "na_values": ["\\N"],
+    },
+    "races.csv": {
+        "usecols": ['raceId', 'year', 'round', 'name', 'date'],
+        "dtype": {'raceId': 'int32', 'year': 'int16', 'round': 'int16', 'date': str,
+                  'name': 'category'},
+    },
+    "drivers.csv": {
+        "dtype": {'driverId': 'int32', 'forename': 'category', 'surname': 'category'},
+    },
+    "status.csv": {
+        "dtype": {'statusId': 'int16', 'status': 'category'},
+    },
+}
+
 def download_dataset() -> str:
     """Download (or reuse cached) dataset and return its local path."""
     path = kagglehub.dataset_download(DATASET)
     return path
 
+@st.cache_data(show_spinner=False)
 def load_core_tables(path: str = None) -> dict:
     """
     Load core CSVs as DataFrames.
@@ -23,7 +49,7 @@ def load_core_tables(path: str = None) -> dict:
 
     def _read(name):
         p = os.path.join(path, name)
-        return pd.read_csv(p)
+        return pd.read_csv(p, engine="pyarrow", **CSV_SCHEMAS.get(name, {}))
 
     dfs = {
         "drivers": _read("drivers.csv"),
@@ -37,17 +63,25 @@ def load_core_tables(path: str = None) -> dict:
         "status": _read("status.csv"),
     }
 
-    # Use constants for file paths
+    # full driver name once at load time (shared by every page/analysis call)
+    drivers = dfs["drivers"]
+    drivers["driver_name"] = (
+        drivers["forename"].astype(str).str.cat(drivers["surname"].astype(str), sep=" ").astype("category")
+    )
+
+    # Optional extras: read directly, fall back to empty frames when missing
     circuits_geo_path = os.path.join(path, CIRCUITS_GEO_PATH)
-    if os.path.exists(circuits_geo_path):
+    try:
         dfs["circuits_geo"] = pd.read_csv(circuits_geo_path)
-    else:
+    except FileNotFoundError:
         dfs["circuits_geo"] = pd.DataFrame()
 
     weather_path = os.path.join(path, WEATHER_PATH)
-    if os.path.exists(weather_path):
-        dfs["weather"] = pd.read_csv(weather_path)
-    else:
-        dfs["weather"] = pd.DataFrame(columns=['GP','Date','Avg_Temperature','Humidity','Precipitation'])
+    try:
+        weather = pd.read_csv(weather_path)
+    except FileNotFoundError:
+        weather = pd.DataFrame(columns=['GP','Date','Avg_Temperature','Humidity','Precipitation'])
+    # indexed by (GP, Date) so build_driver_table joins on the index instead of merging
+    dfs["weather"] = weather.set_index(['GP', 'Date'])
 
     return dfs
@@ -3,6 +3,7 @@ import matplotlib.pyplot as plt
 import fastf1
 import fastf1.plotting as fplot
 import numpy as np
+import streamlit as st
 from matplotlib.collections import LineCollection
 
 # Setup FastF1 cache
@@ -10,13 +11,23 @@ CACHE_DIR = os.path.join("data","CacheFormulaOne")
 os.makedirs(CACHE_DIR, exist_ok=True)
 fastf1.Cache.enable_cache(CACHE_DIR)
 
+@st.cache_resource(max_entries=10, ttl=3600, show_spinner=False)
+def _load_session(year: int, event_name: str, identifier: str):
+    """
+    Load a FastF1 session once per (year, event, identifier) and share it across
+    plots and Streamlit reruns. Sessions hold the whole field's data, so only about
+    one Plots page selection (n_plot <= 10) is kept, for at most an hour.
+    """
+    session = fastf1.get_session(year, event_name, identifier)
+    session.load()
+    return session
+
 def plot_driver_telemetry(year: int, event_name: str, identifier: str, driver_3letter: str):
     """
     Plot Speed vs Distance for the driver's fastest lap in the given session.
     identifier: "R", "Q", "FP1", etc.  driver_3letter: e.g., "VER", "HAM"
     """
-    session = fastf1.get_session(year, event_name, identifier)
-    session.load()
+    session = _load_session(year, event_name, identifier)
 
     laps = session.laps.pick_driver(driver_3letter)
     if laps.empty:
@@ -42,8 +53,7 @@ def _get_fastest_lap_telemetry(year: int, event_name: str, identifier: str, driv
     Return telemetry DataFrame for the driver's fastest lap including GPS (X,Y), Speed, Distance
     and the circuit corners df (may be empty).
     """
-    session = fastf1.get_session(year, event_name, identifier)
-    session.load()
+    session = _load_session(year, event_name, identifier)
 
     laps = session.laps.pick_driver(driver_3letter)
     if laps is None or laps.empty:
@@ -65,11 +75,40 @@ def _get_fastest_lap_telemetry(year: int, event_name: str, identifier: str, driv
     return tel, corners
 
 
+def _line_segments(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """
+    (N-1, 2, 2) float32 segment array for a LineCollection, filled in place
+    (no reshape/concatenate temporaries).
+    """
+    segs = np.empty((max(len(x) - 1, 0), 2, 2), dtype=np.float32)
+    segs[:, 0, 0] = x[:-1]; segs[:, 0, 1] = y[:-1]
+    segs[:, 1, 0] = x[1:];  segs[:, 1, 1] = y[1:]
+    return segs
+
+
+def _resample_by_arclength(x: np.ndarray, y: np.ndarray, s: np.ndarray, n_points: int):
+    """
+    Resample a lap to n_points evenly spaced along its (x, y) path, interpolating speed.
+    Laps with at most n_points samples (or fewer than two valid positions) are returned as is.
+    """
+    ok = np.isfinite(x) & np.isfinite(y)
+    if len(x) <= n_points or ok.sum() < 2:
+        return x, y, s
+    x, y, s = x[ok], y[ok], s[ok]
+    d = np.empty(len(x))
+    d[0] = 0.0
+    np.cumsum(np.hypot(np.diff(x), np.diff(y)), out=d[1:])
+    t = np.linspace(0.0, d[-1], n_points)
+    return np.interp(t, d, x), np.interp(t, d, y), np.interp(t, d, s)
+
+
 def plot_speedmap_from_telemetry(tdf, title: str = "", cmap: str = "viridis", lw: float = 3.0,
                                  vmin: float | None = None, vmax: float | None = None,
-                                 corners=None, annotate_corners: bool = True):
+                                 corners=None, annotate_corners: bool = True,
+                                 max_points: int | None = 1500):
     """
     Draw a colored polyline by speed using telemetry columns ['X','Y','Speed'] (and optional 'Distance' for corner labels).
+    Laps longer than max_points samples are resampled evenly along the track before drawing (None = draw all).
     Returns a matplotlib Figure.
     """
     fplot.setup_mpl(misc_mpl_mods=False)
@@ -84,11 +123,11 @@ def plot_speedmap_from_telemetry(tdf, title: str = "", cmap: str = "viridis", lw
     y = tdf["Y"].to_numpy(dtype=float)
     s = tdf["Speed"].to_numpy(dtype=float)
 
-    # Build line segments
-    points = np.array([x, y]).T.reshape(-1, 1, 2)
-    segs = np.concatenate([points[:-1], points[1:]], axis=1)
+    # Resample dense laps: neighbouring samples are visually coincident at figure resolution
+    if max_points is not None:
+        x, y, s = _resample_by_arclength(x, y, s, max_points)
 
-    lc = LineCollection(segs, array=s[:-1], cmap=cmap, linewidths=lw)
+    lc = LineCollection(_line_segments(x, y), array=s[:-1], cmap=cmap, linewidths=lw)
     if vmin is not None and vmax is not None:
         lc.set_clim(vmin=vmin, vmax=vmax)
     ax.add_collection(lc)
@@ -111,16 +150,23 @@ def plot_speedmap_from_telemetry(tdf, title: str = "", cmap: str = "viridis", lw
     if annotate_corners and corners is not None and not getattr(corners, "empty", True):
         if "Distance" in tdf.columns and "Distance" in corners.columns:
             td = tdf["Distance"].to_numpy(dtype=float)
-            for _, c in corners.reset_index(drop=True).iterrows():
-                try:
-                    d0 = float(c["Distance"])
-                except Exception:
-                    continue
-                idx = int(np.argmin(np.abs(td - d0)))
-                x0, y0 = float(tdf.iloc[idx]["X"]), float(tdf.iloc[idx]["Y"])
+            tx = tdf["X"].to_numpy(dtype=float)
+            ty = tdf["Y"].to_numpy(dtype=float)
+            cdf = corners.reset_index(drop=True)
+            corner_ds = cdf["Distance"].to_numpy(dtype=float)
+            ok = ~np.isnan(corner_ds)
+            cdf, corner_ds = cdf[ok], corner_ds[ok]
+
+            # Distance is monotonic along the lap: nearest sample via one searchsorted (ties go left)
+            hi = np.searchsorted(td, corner_ds).clip(0, len(td) - 1)
+            lo = (hi - 1).clip(0)
+            idxs = np.where(np.abs(td[lo] - corner_ds) <= np.abs(td[hi] - corner_ds), lo, hi)
+            idxs = np.searchsorted(td, td[idxs])  # first of any repeated distances
+
+            for idx, c in zip(idxs, cdf.to_dict("records")):
                 label = str(int(c.get("Number", ""))) if c.get("Number") == c.get("Number") else c.get("Letter", "")
                 if label:
-                    ax.text(x0, y0, label, fontsize=8, weight="bold")
+                    ax.text(tx[idx], ty[idx], label, fontsize=8, weight="bold")
 
     return fig
 
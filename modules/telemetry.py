@@ -1,7 +1,13 @@
 # modules/telemetry.py
+import os
+import re
+import warnings
+import functools
 import numpy as np
 import pandas as pd
+from enum import IntEnum
 from typing import Tuple
+from concurrent.futures import ThreadPoolExecutor
 
 # Reuse your helpers / naming from utils (normalize_name already lives there)
 from .utils import normalize_name
@@ -13,46 +19,111 @@ try:
 except Exception:
     pass
 
+# Resolved (car_data, corners, drs_zones) per lap, stored as parquet (see _disk_cached_lap)
+DERIVED_CACHE_DIR = os.path.join(".fastf1cache", "derived")
+_DERIVED_FRAMES = ("car_data", "corners", "drs_zones")
+
+
+class Zone(IntEnum):
+    """Row indices of the per-lap (len(Zone), n_samples) boolean mask matrix."""
+    CORNER = 0
+    STRAIGHT = 1
+    DRS = 2
+    NONDRS = 3
+    ACCEL = 4
+    BRAKE = 5
+    SLOW = 6
+    MEDIUM = 7
+    HIGH = 8
+    HAIRPIN = 9
+    CHICANE = 10
+    CHICANE_SLOW = 11
+    CHICANE_FAST = 12
+    COMPLEX = 13
+
 
 def _safe_col(df: pd.DataFrame, col: str) -> bool:
-    return (col in df.columns) and (df[col].notna().any())
+    # FastF1 channels are either present or absent; gaps inside one are zero-filled downstream
+    return col in df.columns
 
 
-def _speed_kph_to_mps(v: np.ndarray) -> np.ndarray:
-    return v / 3.6
+def _as_float(df: pd.DataFrame, col: str) -> np.ndarray:
+    """Numeric/bool telemetry column as float32 with NaN -> 0 (no to_numeric scan, no fillna copy)."""
+    return np.nan_to_num(df[col].to_numpy(dtype=np.float32), nan=0.0, copy=False)
 
 
-def _derive_accel(car_data: pd.DataFrame) -> pd.Series | None:
+def _derive_accel(car_data: pd.DataFrame) -> np.ndarray | None:
     """
-    Return acceleration in m/s^2 from Speed (km/h) and Time (Timedelta).
+    Return acceleration in m/s^2 from Speed (km/h) and Time (Timedelta), as
+    second-order centred differences (np.gradient handles uneven sampling).
+    Samples with no finite estimate (NaN speed, repeated timestamps) get 0.
     """
     if not (_safe_col(car_data, 'Speed') and _safe_col(car_data, 'Time')):
         return None
-    v = _speed_kph_to_mps(car_data['Speed'].to_numpy(dtype=float))
+    v_kph = car_data['Speed'].to_numpy(dtype=float)
     t = car_data['Time'].dt.total_seconds().to_numpy(dtype=float)
     if t.size < 2:
-        return pd.Series(np.zeros(len(car_data)), index=car_data.index, name='acc_mps2')
-    dv = np.diff(v, prepend=v[0])
-    dt0 = max(t[1] - t[0], 1e-3)
-    dt = np.diff(t, prepend=dt0)
-    dt[dt == 0] = dt0
-    acc = np.divide(dv, dt, out=np.zeros_like(dv), where=dt != 0)
-    return pd.Series(acc, index=car_data.index, name='acc_mps2')
+        return np.zeros(len(car_data))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        acc = np.gradient(v_kph, t)
+    acc *= 1 / 3.6  # km/h/s -> m/s^2, in place on the gradient (no converted copy of Speed)
+    acc[~np.isfinite(acc)] = 0.0
+    return acc
+
 
+def _driver_code(driver_full_name: str) -> str:
+    """Three-letter FastF1 code from a full name ('Max Verstappen' -> 'VER')."""
+    surname = str(driver_full_name).split()[-1]
+    return normalize_name(surname)[:3].upper()
 
+
+def _disk_cached_lap(fn):
+    """
+    Persist the frames returned by a lap loader under DERIVED_CACHE_DIR, one parquet
+    per frame keyed by (year, gp, driver code, lap), so repeat runs skip the
+    FastF1 session parse. The loader returns (car_data, corners, drs_zones, complete);
+    the wrapper returns the three frames and only caches complete loads (no failed
+    lap, no fallback circuit info).
+    """
+    @functools.wraps(fn)
+    def wrapper(driver_full_name: str, year: int, gp_name: str, fastest_lap_number: int | None = None):
+        lap = "fastest" if fastest_lap_number is None or pd.isna(fastest_lap_number) else int(fastest_lap_number)
+        key = re.sub(r"[^0-9A-Za-z_]+", "-", f"{int(year)}_{gp_name}_{_driver_code(driver_full_name)}_{lap}")
+        paths = [os.path.join(DERIVED_CACHE_DIR, f"{key}.{name}.parquet") for name in _DERIVED_FRAMES]
+
+        if all(os.path.exists(p) for p in paths):
+            try:
+                return tuple(pd.read_parquet(p) for p in paths)
+            except Exception as e:
+                print(f"[WARN] derived cache unreadable for {key}: {e}")
+
+        *frames, complete = fn(driver_full_name, year, gp_name, fastest_lap_number=fastest_lap_number)
+        if complete:
+            try:
+                os.makedirs(DERIVED_CACHE_DIR, exist_ok=True)
+                for frame, p in zip(frames, paths):
+                    pd.DataFrame(frame).to_parquet(p)
+            except Exception as e:
+                print(f"[WARN] could not write derived cache for {key}: {e}")
+        return tuple(frames)
+    return wrapper
+
+
+@_disk_cached_lap
 def _load_lap_and_circuit(driver_full_name: str, year: int, gp_name: str, fastest_lap_number: int | None = None):
     """
-    Load selected lap car_data(+distance) + circuit corners + drs_zones.
+    Load selected lap car_data(+distance) + circuit corners + drs_zones, plus whether
+    everything came from FastF1 (False when the lap failed or circuit info fell back to
+    empty frames; see _disk_cached_lap).
     """
     try:
         session = ff1.get_session(int(year), gp_name, "R")
         session.load()
     except Exception as e:
         print(f"[WARN] session load failed for {year} {gp_name}: {e}")
-        return None, None, None
+        return None, None, None, False
 
-    surname = str(driver_full_name).split()[-1]
-    driver_code = normalize_name(surname)[:3].upper()
+    driver_code = _driver_code(driver_full_name)
 
     try:
         laps = session.laps.pick_driver(driver_code)
@@ -63,14 +134,15 @@ def _load_lap_and_circuit(driver_full_name: str, year: int, gp_name: str, fastes
             selected_lap = laps.pick_fastest()
     except Exception as e:
         print(f"[WARN] no laps for {driver_full_name} at {year} {gp_name}: {e}")
-        return None, None, None
+        return None, None, None, False
 
     try:
         car_data = selected_lap.get_car_data().add_distance()  # Speed, DRS, Throttle, Brake, Distance, Time
     except Exception as e:
         print(f"[WARN] no car_data for {driver_full_name} at {year} {gp_name}: {e}")
-        return None, None, None
+        return None, None, None, False
 
+    circuit_ok = True
     try:
         ci = session.get_circuit_info()
         corners = ci.corners.copy()
@@ -79,14 +151,197 @@ def _load_lap_and_circuit(driver_full_name: str, year: int, gp_name: str, fastes
             drs_zones = pd.DataFrame(columns=['DistanceActivation', 'DistanceEnd'])
     except Exception as e:
         print(f"[WARN] circuit info not available: {e}")
+        circuit_ok = False  # transient failure: don't persist the empty fallback frames
         corners = pd.DataFrame(columns=['Number', 'Letter', 'Distance'])
         drs_zones = pd.DataFrame(columns=['DistanceActivation', 'DistanceEnd'])
 
-    return car_data, corners, drs_zones
+    return car_data, corners, drs_zones, circuit_ok
+
+
+def _drs_zone_mask(drs_zones: pd.DataFrame, dist_arr: np.ndarray) -> np.ndarray:
+    """
+    Samples inside any DRS zone. Zones are sorted by start and each sample is
+    looked up with one searchsorted against the running max of zone ends (so
+    overlapping zones are handled too). Zones with a missing bound are ignored.
+    """
+    bounds = [pd.to_numeric(drs_zones[c], errors='coerce').to_numpy(dtype=float)
+              if c in drs_zones.columns else np.full(len(drs_zones), np.nan)
+              for c in ('DistanceActivation', 'DistanceEnd')]
+    ok = ~(np.isnan(bounds[0]) | np.isnan(bounds[1]))
+    starts, ends = np.minimum(*bounds)[ok], np.maximum(*bounds)[ok]
+    if not len(starts):
+        return np.zeros(len(dist_arr), dtype=bool)
+    order = np.argsort(starts)
+    starts, reach = starts[order], np.maximum.accumulate(ends[order])
+    idx = np.searchsorted(starts, dist_arr, side='right') - 1
+    return (idx >= 0) & (dist_arr <= reach[idx.clip(0)])
+
+
+def _process_one_race(
+    row,
+    driver_full_name: str,
+    *,
+    slow_thr_kph: float,
+    medium_thr_kph: float,
+    hairpin_thr_kph: float,
+    chicane_gap_m: float,
+    chicane_window_m: float,
+    complex_span_m: float,
+    corner_window_m: float,
+    accel_thr_mps2: float,
+    brake_thr_mps2: float,
+    throttle_min_pct: float,
+    brake_min_pct: float,
+) -> dict | None:
+    """
+    Summary row for one topN race (None when it is skipped or has no telemetry).
+    Races don't share state, so analyze_topN_rich runs these in threads.
+    """
+    year = int(row['year'])
+    gp = row['name']
+
+    if year < 2018:
+        print(f"[INFO] Skipping {year} {gp} (telemetry pre-2018 not available).")
+        return None
 
+    car_data, corners, drs_zones = _load_lap_and_circuit(driver_full_name, year, gp, fastest_lap_number=None)
+    if car_data is None or car_data.empty:
+        return None
 
-def _segment_mask_by_distance(distance_series: pd.Series, start: float, end: float) -> pd.Series:
-    return (distance_series >= start) & (distance_series <= end)
+    dist = car_data['Distance']
+    speed = car_data['Speed']
+    has_drs_col = _safe_col(car_data, 'DRS')
+    has_thr_col = _safe_col(car_data, 'Throttle')
+    has_brk_col = _safe_col(car_data, 'Brake')
+
+    acc = _derive_accel(car_data)
+    if acc is None:
+        acc = np.zeros(len(car_data))
+
+    # float32 working arrays: half the bytes for every mask/stat pass below
+    # (sums/counts still accumulate in float64 through the matmul)
+    dist_arr = dist.to_numpy(dtype=np.float32)
+    speed_arr = speed.to_numpy(dtype=np.float32)
+
+    # tag corners: one (n_corners x n_samples) window matrix, row i = corner i
+    if not corners.empty and 'Distance' in corners.columns:
+        corner_d = pd.to_numeric(corners['Distance'], errors='coerce').to_numpy(dtype=float)
+    else:
+        corner_d = np.empty(0)
+    M = ((dist_arr[None, :] >= corner_d[:, None] - corner_window_m)
+         & (dist_arr[None, :] <= corner_d[:, None] + corner_window_m))
+    hit = M.any(axis=1)              # corners with no samples in their window are dropped
+    M, corner_d = M[hit], corner_d[hit]
+    masks = np.zeros((len(Zone), len(car_data)), dtype=bool)  # one row per Zone
+    masks[Zone.CORNER] = M.any(axis=0)
+
+    # apex = slowest (non-NaN) sample inside each window
+    apex = np.where(M & ~np.isnan(speed_arr), speed_arr, np.inf).min(axis=1)
+    apex[np.isinf(apex)] = np.nan
+
+    is_straight = np.logical_not(masks[Zone.CORNER], out=masks[Zone.STRAIGHT])
+
+    # DRS masks
+    if has_drs_col:
+        drs_on = _as_float(car_data, 'DRS') > 0
+        np.logical_and(drs_on, is_straight, out=masks[Zone.DRS])
+        np.logical_and(~drs_on, is_straight, out=masks[Zone.NONDRS])
+    else:
+        if drs_zones is not None and not drs_zones.empty:
+            masks[Zone.DRS] = _drs_zone_mask(drs_zones, dist_arr)
+        masks[Zone.DRS] &= is_straight
+        np.logical_and(is_straight, ~masks[Zone.DRS], out=masks[Zone.NONDRS])
+
+    # accel / brake: every comparison writes into a mask row or one scratch row,
+    # so the compound conditions allocate no temporaries
+    scratch = np.empty(len(car_data), dtype=bool)
+    is_accel = np.greater(acc, accel_thr_mps2, out=masks[Zone.ACCEL])
+    if has_thr_col:
+        is_accel &= np.greater_equal(_as_float(car_data, 'Throttle'), throttle_min_pct, out=scratch)
+    is_accel &= is_straight
+
+    is_brake = np.less(acc, brake_thr_mps2, out=masks[Zone.BRAKE])
+    if has_brk_col:
+        is_brake |= np.greater_equal(_as_float(car_data, 'Brake'), brake_min_pct, out=scratch)
+
+    # corner classes: apex thresholds pick rows of M, one any() per class (NaN apex -> high)
+    is_slow = apex < slow_thr_kph
+    is_medium = ~is_slow & (apex < medium_thr_kph)
+    for zone, rows in ((Zone.SLOW, is_slow), (Zone.MEDIUM, is_medium),
+                       (Zone.HIGH, ~(is_slow | is_medium)), (Zone.HAIRPIN, apex < hairpin_thr_kph)):
+        M[rows].any(axis=0, out=masks[zone])
+
+    # chicanes: neighbouring corners (by distance) within chicane_gap_m, one window per pair
+    order = np.argsort(corner_d, kind='stable')
+    d_s, a_s = corner_d[order], apex[order]
+    pair = np.diff(d_s) <= chicane_gap_m
+    centers = (0.5 * (d_s[:-1] + d_s[1:]))[pair]
+    a1, a2 = a_s[:-1][pair], a_s[1:][pair]
+    pair_apex = np.where(a2 < a1, a2, a1)  # min() of the pair, same NaN handling as the builtin
+    W = ((dist_arr[None, :] >= centers[:, None] - chicane_window_m)
+         & (dist_arr[None, :] <= centers[:, None] + chicane_window_m))
+    slow_pair = pair_apex < medium_thr_kph
+    W.any(axis=0, out=masks[Zone.CHICANE])
+    W[slow_pair].any(axis=0, out=masks[Zone.CHICANE_SLOW])
+    W[~slow_pair].any(axis=0, out=masks[Zone.CHICANE_FAST])
+
+    # complexes (≥3 corners in span): for each corner i, the furthest corner j within
+    # complex_span_m via one searchsorted; spans with j - i >= 2 are OR-ed as windows
+    dists = np.sort(corner_d)
+    j_max = np.searchsorted(dists, dists + complex_span_m, side='right') - 1
+    valid = (j_max - np.arange(len(dists))) >= 2
+    span_lo, span_hi = dists[valid] - corner_window_m, dists[j_max[valid]] + corner_window_m
+    spans = (dist_arr[None, :] >= span_lo[:, None]) & (dist_arr[None, :] <= span_hi[:, None])
+    spans.any(axis=0, out=masks[Zone.COMPLEX])
+
+    # stats for every zone at once: masked sums/counts via one matmul,
+    # covered extents via masked min/max, p95 only for the two straight rows
+    masks_f = masks.astype(np.float64)
+    speed_ok = ~np.isnan(speed_arr)
+    counts = masks_f @ speed_ok.astype(np.float64)
+    sums = masks_f @ np.where(speed_ok, speed_arr, 0.0)
+
+    in_dist = masks & ~np.isnan(dist_arr)
+    lo = np.where(in_dist, dist_arr, np.inf).min(axis=1)
+    hi = np.where(in_dist, dist_arr, -np.inf).max(axis=1)
+    total = np.nanmax(dist_arr) - np.nanmin(dist_arr)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean_kph = np.where(counts > 0, sums / counts, np.nan)
+        coverage_pct = np.where(in_dist.any(axis=1) & (total > 0), 100.0 * (hi - lo).astype(np.float64) / total, 0.0)
+
+    straights = masks[[Zone.DRS, Zone.NONDRS]]
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)  # all-NaN rows -> NaN
+        p95_drs, p95_nondrs = np.nanpercentile(np.where(straights, speed_arr, np.nan), 95, axis=1).astype(np.float64)
+
+    row_out = {
+        'year': year, 'gp': gp, 'driver': driver_full_name, 'lap_used': 'fastest',
+        'mean_kph_straight_drs': mean_kph[Zone.DRS],
+        'mean_kph_straight_nondrs': mean_kph[Zone.NONDRS],
+        'p95_kph_straight_drs': p95_drs,
+        'p95_kph_straight_nondrs': p95_nondrs,
+        'coverage_pct_straight_drs': coverage_pct[Zone.DRS],
+        'coverage_pct_straight_nondrs': coverage_pct[Zone.NONDRS],
+        'mean_kph_accel_zones': mean_kph[Zone.ACCEL],
+        'mean_kph_brake_zones': mean_kph[Zone.BRAKE],
+        'coverage_pct_accel_zones': coverage_pct[Zone.ACCEL],
+        'coverage_pct_brake_zones': coverage_pct[Zone.BRAKE],
+        'mean_kph_slow_corners': mean_kph[Zone.SLOW],
+        'mean_kph_medium_corners': mean_kph[Zone.MEDIUM],
+        'mean_kph_high_corners': mean_kph[Zone.HIGH],
+        'coverage_pct_slow_corners': coverage_pct[Zone.SLOW],
+        'coverage_pct_medium_corners': coverage_pct[Zone.MEDIUM],
+        'coverage_pct_high_corners': coverage_pct[Zone.HIGH],
+        'mean_kph_hairpins': mean_kph[Zone.HAIRPIN],
+        'coverage_pct_hairpins': coverage_pct[Zone.HAIRPIN],
+        'mean_kph_chicane_slow': mean_kph[Zone.CHICANE_SLOW],
+        'mean_kph_chicane_fast': mean_kph[Zone.CHICANE_FAST],
+        'coverage_pct_chicane_slow': coverage_pct[Zone.CHICANE_SLOW],
+        'coverage_pct_chicane_fast': coverage_pct[Zone.CHICANE_FAST],
+        'mean_kph_complexes': mean_kph[Zone.COMPLEX],
+        'coverage_pct_complexes': coverage_pct[Zone.COMPLEX],
+    }
+    return row_out
 
 
 def analyze_topN_rich(
@@ -114,186 +369,22 @@ def analyze_topN_rich(
 
     Expects topN to contain at least: ['year','name'].
     """
-    out_rows = []
     if topN is None or topN.empty:
         return pd.DataFrame(), pd.DataFrame(columns=['metric', 'value'])
 
-    for _, row in topN.iterrows():
-        year = int(row['year'])
-        gp = row['name']
-
-        if year < 2018:
-            print(f"[INFO] Skipping {year} {gp} (telemetry pre-2018 not available).")
-            continue
-
-        car_data, corners, drs_zones = _load_lap_and_circuit(driver_full_name, year, gp, fastest_lap_number=None)
-        if car_data is None or car_data.empty:
-            continue
-
-        dist = car_data['Distance']
-        speed = car_data['Speed']
-        has_drs_col = _safe_col(car_data, 'DRS')
-        has_thr_col = _safe_col(car_data, 'Throttle')
-        has_brk_col = _safe_col(car_data, 'Brake')
-
-        acc = _derive_accel(car_data)
-        if acc is None:
-            acc = pd.Series(np.zeros(len(car_data)), index=car_data.index, name='acc_mps2')
-
-        # tag corners
-        is_corner = pd.Series(False, index=car_data.index)
-        corner_windows = []
-        apex_by_corner = []  # (idx, apex_speed, center_dist)
-        if not corners.empty and 'Distance' in corners.columns:
-            for idx, c in corners.reset_index(drop=True).iterrows():
-                try:
-                    d0 = float(c['Distance'])
-                except Exception:
-                    continue
-                mask = (dist >= d0 - corner_window_m) & (dist <= d0 + corner_window_m)
-                if mask.any():
-                    is_corner |= mask
-                    s_vals = speed[mask].to_numpy(dtype=float)
-                    if s_vals.size > 0:
-                        apex = float(np.nanmin(s_vals))
-                        apex_by_corner.append((idx, apex, d0))
-                    corner_windows.append((idx, d0, mask))
-
-        is_straight = ~is_corner
-
-        # DRS masks
-        if has_drs_col:
-            drs_numeric = pd.to_numeric(car_data['DRS'], errors='coerce').fillna(0.0)
-            is_drs = (drs_numeric > 0) & is_straight
-            is_nondrs = (~(drs_numeric > 0)) & is_straight
-        else:
-            is_drs = pd.Series(False, index=car_data.index)
-            if drs_zones is not None and not drs_zones.empty:
-                for _, dz in drs_zones.iterrows():
-                    try:
-                        a = float(dz.get('DistanceActivation', np.nan))
-                        b = float(dz.get('DistanceEnd', np.nan))
-                        if np.isnan(a) or np.isnan(b):
-                            continue
-                        is_drs |= _segment_mask_by_distance(dist, min(a, b), max(a, b))
-                    except Exception:
-                        continue
-            is_drs &= is_straight
-            is_nondrs = is_straight & (~is_drs)
-
-        # accel / brake
-        is_accel = (acc > accel_thr_mps2)
-        if has_thr_col:
-            thr = pd.to_numeric(car_data['Throttle'], errors='coerce').fillna(0.0)
-            is_accel &= (thr >= throttle_min_pct)
-        is_accel &= is_straight
-
-        is_brake = (acc < brake_thr_mps2)
-        if has_brk_col:
-            brk = pd.to_numeric(car_data['Brake'], errors='coerce').fillna(0.0)
-            is_brake |= (brk >= brake_min_pct)
-
-        # corner classes
-        slow_masks, med_masks, high_masks, hairpin_masks = [], [], [], []
-        for idx, apex, d0 in apex_by_corner:
-            k = next((m for (i, d, m) in corner_windows if i == idx), None)
-            if k is None or not k.any():
-                continue
-            if apex < hairpin_thr_kph:
-                hairpin_masks.append(k)
-            if apex < slow_thr_kph:
-                slow_masks.append(k)
-            elif apex < medium_thr_kph:
-                med_masks.append(k)
-            else:
-                high_masks.append(k)
-
-        is_slow = pd.Series(False, index=car_data.index);   [is_slow.__ior__(m) for m in slow_masks]
-        is_med = pd.Series(False,  index=car_data.index);   [is_med.__ior__(m) for m in med_masks]
-        is_high = pd.Series(False, index=car_data.index);   [is_high.__ior__(m) for m in high_masks]
-        is_hairpin = pd.Series(False, index=car_data.index);[is_hairpin.__ior__(m) for m in hairpin_masks]
-
-        # chicanes
-        is_chicane = pd.Series(False, index=car_data.index)
-        is_chicane_slow = pd.Series(False, index=car_data.index)
-        is_chicane_fast = pd.Series(False, index=car_data.index)
-        if len(apex_by_corner) >= 2:
-            apex_by_corner_sorted = sorted(apex_by_corner, key=lambda x: x[2])
-            for (i1, apex1, d1), (i2, apex2, d2) in zip(apex_by_corner_sorted[:-1], apex_by_corner_sorted[1:]):
-                if abs(d2 - d1) <= chicane_gap_m:
-                    center = 0.5 * (d1 + d2)
-                    combo_mask = (dist >= center - chicane_window_m) & (dist <= center + chicane_window_m)
-                    if combo_mask.any():
-                        is_chicane |= combo_mask
-                        pair_apex = min(apex1, apex2)
-                        if pair_apex < medium_thr_kph:
-                            is_chicane_slow |= combo_mask
-                        else:
-                            is_chicane_fast |= combo_mask
-
-        # complexes (≥3 corners in span)
-        is_complex = pd.Series(False, index=car_data.index)
-        if len(apex_by_corner) >= 3:
-            dists = np.array([d for (_, _, d) in apex_by_corner])
-            dists.sort()
-            i, L = 0, len(dists)
-            while i < L:
-                j = i
-                while j + 1 < L and (dists[j + 1] - dists[i] <= complex_span_m):
-                    j += 1
-                if (j - i + 1) >= 3:
-                    start = dists[i] - corner_window_m
-                    end = dists[j] + corner_window_m
-                    is_complex |= _segment_mask_by_distance(dist, start, end)
-                i += 1
-
-        # stat helpers
-        def mean_speed(mask: pd.Series) -> float:
-            arr = speed[mask].to_numpy(dtype=float)
-            return float(np.nanmean(arr)) if arr.size else np.nan
-
-        def coverage(mask: pd.Series) -> float:
-            if dist.empty:
-                return 0.0
-            covered = dist[mask]
-            if covered.empty:
-                return 0.0
-            length = covered.max() - covered.min() if len(covered) else 0.0
-            total = dist.max() - dist.min()
-            return float(100.0 * length / total) if total > 0 else 0.0
-
-        def p95_speed(mask: pd.Series) -> float:
-            arr = speed[mask].to_numpy(dtype=float)
-            return float(np.nanpercentile(arr, 95)) if arr.size else np.nan
-
-        row_out = {
-            'year': year, 'gp': gp, 'driver': driver_full_name, 'lap_used': 'fastest',
-            'mean_kph_straight_drs': mean_speed(is_drs),
-            'mean_kph_straight_nondrs': mean_speed(is_nondrs),
-            'p95_kph_straight_drs': p95_speed(is_drs),
-            'p95_kph_straight_nondrs': p95_speed(is_nondrs),
-            'coverage_pct_straight_drs': coverage(is_drs),
-            'coverage_pct_straight_nondrs': coverage(is_nondrs),
-            'mean_kph_accel_zones': mean_speed(is_accel),
-            'mean_kph_brake_zones': mean_speed(is_brake),
-            'coverage_pct_accel_zones': coverage(is_accel),
-            'coverage_pct_brake_zones': coverage(is_brake),
-            'mean_kph_slow_corners': mean_speed(is_slow),
-            'mean_kph_medium_corners': mean_speed(is_med),
-            'mean_kph_high_corners': mean_speed(is_high),
-            'coverage_pct_slow_corners': coverage(is_slow),
-            'coverage_pct_medium_corners': coverage(is_med),
-            'coverage_pct_high_corners': coverage(is_high),
-            'mean_kph_hairpins': mean_speed(is_hairpin),
-            'coverage_pct_hairpins': coverage(is_hairpin),
-            'mean_kph_chicane_slow': mean_speed(is_chicane_slow),
-            'mean_kph_chicane_fast': mean_speed(is_chicane_fast),
-            'coverage_pct_chicane_slow': coverage(is_chicane_slow),
-            'coverage_pct_chicane_fast': coverage(is_chicane_fast),
-            'mean_kph_complexes': mean_speed(is_complex),
-            'coverage_pct_complexes': coverage(is_complex),
-        }
-        out_rows.append(row_out)
+    knobs = dict(
+        slow_thr_kph=slow_thr_kph, medium_thr_kph=medium_thr_kph, hairpin_thr_kph=hairpin_thr_kph,
+        chicane_gap_m=chicane_gap_m, chicane_window_m=chicane_window_m, complex_span_m=complex_span_m,
+        corner_window_m=corner_window_m, accel_thr_mps2=accel_thr_mps2, brake_thr_mps2=brake_thr_mps2,
+        throttle_min_pct=throttle_min_pct, brake_min_pct=brake_min_pct,
+    )
+    # overlap the per-race FastF1 loads (I/O bound) across threads; map() keeps topN order
+    rows = [row for _, row in topN.iterrows()]
+    with ThreadPoolExecutor(max_workers=min(8, len(rows))) as pool:
+        results = pool.map(lambda row: _process_one_race(row, driver_full_name, **knobs), rows)
+        out_rows = [r for r in results if r is not None]
+    if not out_rows:
+        return pd.DataFrame(), pd.DataFrame(columns=['metric', 'value'])
 
     per_race = pd.DataFrame(out_rows).sort_values(['year', 'gp']).reset_index(drop=True)
     if per_race.empty:
@@ -1,4 +1,7 @@
 import os
+import re
+import sys
+import functools
 import fastf1 as ff1
 import warnings
 import logging
@@ -10,13 +13,16 @@ import unicodedata
 # warnings.simplefilter(action='ignore', category=FutureWarning)
 
 
+@functools.cache
+def _combining_marks_table() -> dict:
+    """str.translate table deleting every combining mark (category 'Mn'); built on first use."""
+    return {cp: None for cp in range(sys.maxunicode + 1) if unicodedata.category(chr(cp)) == 'Mn'}
+
+@functools.lru_cache(maxsize=4096)
 def normalize_name(name: str) -> str:
     if pd.isna(name):
         return ""
-    return ''.join(
-        c for c in unicodedata.normalize('NFKD', name)
-        if unicodedata.category(c) != 'Mn'
-    )
+    return unicodedata.normalize('NFKD', name).translate(_combining_marks_table())
 
 def convert_time_to_seconds(time_str):
     """
@@ -42,6 +48,19 @@ def convert_time_to_seconds(time_str):
         return None
     return None
 
+# [[h:]m:]s with the '+' and padding already stripped; compiled once at import
+_TIME_RE = re.compile(r'^(?:(?:(\d+):)?(\d+):)?([\d.]+)$')
+
+def convert_time_to_seconds_series(s: pd.Series) -> pd.Series:
+    """
+    Vectorized convert_time_to_seconds for a whole column.
+    Unparseable values ("\\N", "+1 Lap", ...) become NaN instead of None.
+    """
+    s2 = s.astype('string').str.replace('+', '', regex=False).str.strip()
+    parts = s2.str.extract(_TIME_RE)
+    h, m, sec = (pd.to_numeric(parts[k], errors='coerce') for k in range(3))
+    return (h.fillna(0) * 3600 + m.fillna(0) * 60 + sec).astype(float)
+
 def convert_seconds_to_time_str(seconds):
     if seconds is None:
         return ""
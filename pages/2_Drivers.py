@@ -1,5 +1,6 @@
 import streamlit as st
 import pandas as pd
+import pyarrow as pa
 from modules import data_loader, analysis  # plotting, normalize_name not needed here
 
 st.title("🏎️ F1 Driver Performance Explorer")
@@ -22,53 +23,40 @@ with st.sidebar:
 # -------------------------------
 @st.cache_data(show_spinner=False)
 def _cached_core_tables():
-    return data_loader.load_core_tables()
+    dfs = data_loader.load_core_tables()
+    # id-indexed lookups, built once, so the page joins on the index instead of merging
+    races_by_id = dfs['races'].set_index('raceId')[['year', 'name', 'date']]
+    drivers_by_id = dfs['drivers'].set_index('driverId')[['driver_name']].rename(columns={'driver_name': 'Driver'})
+    return dfs, races_by_id, drivers_by_id
 
-dfs = _cached_core_tables()
-drivers = dfs['drivers'].copy()
-races   = dfs['races'].copy()
-results = dfs['results'].copy()
+@st.cache_data(show_spinner=False)
+def _cached_driver_names(year_min: int, year_max: int, wins_only: bool) -> list:
+    """Sorted unique driver names with a result (or a win) in [year_min, year_max]."""
+    dfs, races_by_id, drivers_by_id = _cached_core_tables()
+    results = dfs['results']  # cached: read-only, never copied
 
-# Keep only races within the selected year range
-races_in_range = races[(races['year'] >= year_range[0]) & (races['year'] <= year_range[1])]
+    # Keep only races within the selected year range
+    races_in_range = races_by_id[races_by_id['year'].between(year_min, year_max)]
 
-# Merge results with race + driver data
-merged = (
-    results
-    .merge(races_in_range[['raceId', 'year', 'name', 'date']], on='raceId', how='inner')
-    .merge(drivers[['driverId', 'forename', 'surname']], on='driverId', how='left')
-)
-merged['Driver'] = (merged['forename'].fillna('') + ' ' + merged['surname'].fillna('')).str.strip()
+    # Results for those races with driver names (Driver is the categorical full name)
+    merged = results[results['raceId'].isin(races_in_range.index)].join(drivers_by_id, on='driverId')
+    if wins_only:
+        merged = merged[merged['positionOrder'] == 1]
+    return merged['Driver'].dropna().drop_duplicates().sort_values().tolist()
+
+dfs, _, _ = _cached_core_tables()
+driver_list = _cached_driver_names(year_range[0], year_range[1], wins_only)
 
 # -------------------------------
 # Main screen lists (names only)
 # -------------------------------
 if wins_only:
     st.subheader(f"Winner names • {year_range[0]}–{year_range[1]}")
-    winners_df = (
-        merged.loc[merged['positionOrder'] == 1, ['Driver']]
-        .dropna()
-        .drop_duplicates()
-        .sort_values('Driver')
-        .reset_index(drop=True)
-    )
-    winners_df.index = winners_df.index + 1  # Make index start from 1
-    st.dataframe(winners_df, use_container_width=True)  # names only
-
-
-    driver_list = winners_df['Driver'].tolist()
 else:
     st.subheader(f"All driver names • {year_range[0]}–{year_range[1]}")
-    all_drivers_df = (
-        merged[['Driver']]
-        .dropna()
-        .drop_duplicates()
-        .sort_values('Driver')
-        .reset_index(drop=True)
-    )
-    all_drivers_df.index = all_drivers_df.index + 1  # Make index start from 1
-    st.dataframe(all_drivers_df, use_container_width=True)  # names only
-    driver_list = all_drivers_df['Driver'].tolist()
+names_df = pd.DataFrame({'Driver': driver_list})
+names_df.index = names_df.index + 1  # Make index start from 1
+st.dataframe(names_df, use_container_width=True)  # names only
 
 # Guard: no drivers found -> stop cleanly
 if not driver_list:
@@ -150,4 +138,8 @@ else:
 
     ## new stuff for page 3 (the analysis thingy)
     st.session_state["selected_driver"] = driver
-    st.session_state["top_candidates"] = top_df[["year", "name"]].copy()
+    # Arrow-backed once here (same dtypes as a CSV uploaded on the Analysis page), so the
+    # Analysis/Plots pages slice Arrow buffers instead of categorical/object columns
+    st.session_state["top_candidates"] = top_df[["year", "name"]].astype(
+        {"year": pd.ArrowDtype(pa.int64()), "name": pd.ArrowDtype(pa.string())}
+    )
@@ -20,7 +20,7 @@ if top_candidates.empty or not selected_driver:
     selected_driver = st.text_input("Driver full name", value=selected_driver or "", key="driver_name_input")
     if up is not None:
         try:
-            top_candidates = pd.read_csv(up)
+            top_candidates = pd.read_csv(up, dtype_backend="pyarrow")
         except Exception as e:
             st.error(f"Failed to read CSV: {e}")
             st.stop()
@@ -40,20 +40,67 @@ DEFAULTS = dict(
     throttle_min_pct=50,
     brake_min_pct=10,
 )
+
+# display names for the overall metrics table
+PRETTY_NAMES = {
+    "mean_kph_straight_drs": "Avg Speed – DRS Straights (km/h)",
+    "mean_kph_straight_nondrs": "Avg Speed – Non-DRS Straights (km/h)",
+    "p95_kph_straight_drs": "95th Percentile Speed – DRS Straights (km/h)",
+    "p95_kph_straight_nondrs": "95th Percentile Speed – Non-DRS Straights (km/h)",
+    "coverage_pct_straight_drs": "Track Coverage – DRS Straights (%)",
+    "coverage_pct_straight_nondrs": "Track Coverage – Non-DRS Straights (%)",
+    "mean_kph_accel_zones": "Avg Speed – Acceleration Zones (km/h)",
+    "mean_kph_brake_zones": "Avg Speed – Braking Zones (km/h)",
+    "coverage_pct_accel_zones": "Track Coverage – Acceleration Zones (%)",
+    "coverage_pct_brake_zones": "Track Coverage – Braking Zones (%)",
+    "mean_kph_slow_corners": "Avg Speed – Slow Corners (km/h)",
+    "mean_kph_medium_corners": "Avg Speed – Medium Corners (km/h)",
+    "mean_kph_high_corners": "Avg Speed – High Corners (km/h)",
+    "coverage_pct_slow_corners": "Track Coverage – Slow Corners (%)",
+    "coverage_pct_medium_corners": "Track Coverage – Medium Corners (%)",
+    "coverage_pct_high_corners": "Track Coverage – High Corners (%)",
+    "mean_kph_hairpins": "Avg Speed – Hairpins (km/h)",
+    "coverage_pct_hairpins": "Track Coverage – Hairpins (%)",
+    "mean_kph_chicane_slow": "Avg Speed – Slow Chicanes (km/h)",
+    "mean_kph_chicane_fast": "Avg Speed – Fast Chicanes (km/h)",
+    "coverage_pct_chicane_slow": "Track Coverage – Slow Chicanes (%)",
+    "coverage_pct_chicane_fast": "Track Coverage – Fast Chicanes (%)",
+    "mean_kph_complexes": "Avg Speed – Corner Complexes (km/h)",
+    "coverage_pct_complexes": "Track Coverage – Corner Complexes (%)",
+}
+
 if "analysis_params" not in st.session_state:
     st.session_state.analysis_params = DEFAULTS.copy()
 
-def run_analysis(params: dict):
-    """Run telemetry analysis and capture printed summary."""
+@st.cache_data(show_spinner=False, max_entries=32)
+def _cached_analyze(driver: str, races: tuple, params: tuple, capture_log: bool = False):
+    """
+    analyze_topN_rich for ((year, name), ...) races and sorted param items.
+    Its printed summary is only captured when capture_log is set ("" otherwise).
+    """
+    def _run():
+        return analyze_topN_rich(
+            topN=pd.DataFrame(list(races), columns=["year", "name"]),
+            driver_full_name=driver,
+            **dict(params)
+        )
+    if not capture_log:
+        return (*_run(), "")
     buf = io.StringIO()
     with redirect_stdout(buf):
-        per_race, overall = analyze_topN_rich(
-            topN=top_candidates[["year", "name"]],
-            driver_full_name=selected_driver,
-            **params
-        )
+        per_race, overall = _run()
     return per_race, overall, buf.getvalue().strip()
 
+def run_analysis(params: dict, capture_log: bool = False):
+    """Run telemetry analysis, optionally capturing its printed summary (cached per driver, races and params)."""
+    races = tuple((int(y), str(n)) for y, n in top_candidates[["year", "name"]].itertuples(index=False))
+    return _cached_analyze(selected_driver, races, tuple(sorted(params.items())), capture_log)
+
+@st.cache_data(show_spinner=False)
+def _csv_bytes(df: pd.DataFrame) -> bytes:
+    """UTF-8 CSV for a download button, encoded once per distinct frame."""
+    return df.to_csv(index=False).encode("utf-8")
+
 left, right = st.columns([0.6, 0.4])
 with left:
     st.caption("Selection")
@@ -99,11 +146,13 @@ with st.expander("Advanced (optional) — tune parameters", expanded=False):
             st.experimental_rerun()
     st.session_state.analysis_params = p
 
+show_log = st.checkbox("Show analysis log", value=False, key="show_analysis_log")
 with st.spinner("Computing analysis…"):
-    per_race_df, overall_df, printed = run_analysis(st.session_state.analysis_params)
-st.markdown("### Summary")
-if printed:
-    st.code(printed, language="text")
+    per_race_df, overall_df, printed = run_analysis(st.session_state.analysis_params, capture_log=show_log)
+if show_log:
+    st.markdown("### Summary")
+    if printed:
+        st.code(printed, language="text")
 
 st.markdown("### Per-race metrics")
 if per_race_df is None or per_race_df.empty:
@@ -114,50 +163,24 @@ else:
 st.markdown("### Overall averages")
 
 if overall_df is not None and not overall_df.empty:
-    pretty_names = {
-        "mean_kph_straight_drs": "Avg Speed – DRS Straights (km/h)",
-        "mean_kph_straight_nondrs": "Avg Speed – Non-DRS Straights (km/h)",
-        "p95_kph_straight_drs": "95th Percentile Speed – DRS Straights (km/h)",
-        "p95_kph_straight_nondrs": "95th Percentile Speed – Non-DRS Straights (km/h)",
-        "coverage_pct_straight_drs": "Track Coverage – DRS Straights (%)",
-        "coverage_pct_straight_nondrs": "Track Coverage – Non-DRS Straights (%)",
-        "mean_kph_accel_zones": "Avg Speed – Acceleration Zones (km/h)",
-        "mean_kph_brake_zones": "Avg Speed – Braking Zones (km/h)",
-        "coverage_pct_accel_zones": "Track Coverage – Acceleration Zones (%)",
-        "coverage_pct_brake_zones": "Track Coverage – Braking Zones (%)",
-        "mean_kph_slow_corners": "Avg Speed – Slow Corners (km/h)",
-        "mean_kph_medium_corners": "Avg Speed – Medium Corners (km/h)",
-        "mean_kph_high_corners": "Avg Speed – High Corners (km/h)",
-        "coverage_pct_slow_corners": "Track Coverage – Slow Corners (%)",
-        "coverage_pct_medium_corners": "Track Coverage – Medium Corners (%)",
-        "coverage_pct_high_corners": "Track Coverage – High Corners (%)",
-        "mean_kph_hairpins": "Avg Speed – Hairpins (km/h)",
-        "coverage_pct_hairpins": "Track Coverage – Hairpins (%)",
-        "mean_kph_chicane_slow": "Avg Speed – Slow Chicanes (km/h)",
-        "mean_kph_chicane_fast": "Avg Speed – Fast Chicanes (km/h)",
-        "coverage_pct_chicane_slow": "Track Coverage – Slow Chicanes (%)",
-        "coverage_pct_chicane_fast": "Track Coverage – Fast Chicanes (%)",
-        "mean_kph_complexes": "Avg Speed – Corner Complexes (km/h)",
-        "coverage_pct_complexes": "Track Coverage – Corner Complexes (%)",
-    }
-
-    pretty_df = overall_df.copy()
-    pretty_df["Metric"] = pretty_df["metric"].map(lambda x: pretty_names.get(x, x))
-    pretty_df = pretty_df[["Metric", "value"]].rename(columns={"value": "Value"})
+    pretty_df = pd.DataFrame({
+        "Metric": overall_df["metric"].map(PRETTY_NAMES).fillna(overall_df["metric"]),
+        "Value": overall_df["value"],
+    })
 
     st.dataframe(pretty_df, use_container_width=True)
 
     c1, c2 = st.columns(2)
     c1.download_button(
         "Download per-race CSV",
-        per_race_df.to_csv(index=False).encode("utf-8"),
+        _csv_bytes(per_race_df),
         file_name="per_race_rich.csv",
         mime="text/csv",
         key="dl_per_race_csv",
     )
     c2.download_button(
         "Download overall CSV (raw metrics)",
-        overall_df.to_csv(index=False).encode("utf-8"),
+        _csv_bytes(overall_df),
         file_name="overall_rich.csv",
         mime="text/csv",
         key="dl_overall_csv",
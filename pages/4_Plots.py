@@ -1,11 +1,13 @@
 import io
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 import pandas as pd
 import streamlit as st
 import matplotlib.pyplot as plt
 from matplotlib.collections import LineCollection
 
-from modules.plotting import plot_speedmap, _get_fastest_lap_telemetry, plot_speedmap_from_telemetry
+from modules.plotting import (_get_fastest_lap_telemetry, _line_segments, _resample_by_arclength,
+                              plot_speedmap_from_telemetry)
 from modules.utils import normalize_name  
 st.set_page_config(page_title="F1 Telemetry Plots", page_icon="📊", layout="wide")
 st.title("Track Maps")
@@ -17,8 +19,18 @@ if top_candidates.empty or not selected_driver:
     st.info("Open **Drivers** page first, pick a driver and Top-N. Then come back here.")
     st.stop()
 
-surname = str(selected_driver).split()[-1]
-driver_code = normalize_name(surname)[:3].upper()
+@st.cache_data(ttl=24 * 3600, max_entries=128, show_spinner=False)
+def _cached_tel(year: int, gp: str, session: str, code: str):
+    """Fastest-lap telemetry + corners per (year, gp, session, driver); cosmetic reruns reuse it."""
+    tel, corners = _get_fastest_lap_telemetry(year, gp, session, code)
+    # plain frames: FastF1's Telemetry keeps a reference to the whole session
+    return (pd.DataFrame(tel) if tel is not None else None), corners
+
+# the code depends only on the selected driver: derive it once per name, not on every rerun
+code_cache = st.session_state.setdefault("_driver_code_cache", {})
+if selected_driver not in code_cache:
+    code_cache[selected_driver] = normalize_name(str(selected_driver).split()[-1])[:3].upper()
+driver_code = code_cache[selected_driver]
 
 with st.sidebar:
     st.header("Plot controls")
@@ -30,51 +42,81 @@ with st.sidebar:
     lw = st.slider("Line width", 1.0, 6.0, 3.0, 0.5)
     annotate = st.checkbox("Annotate corner numbers", value=True)
     normalize_scale = st.checkbox("Normalize color scale across all laps", value=True)
+    fast_render = st.checkbox("Fast rendering (downsample)", value=True)
 
-sel_top = top_candidates[["year", "name"]].head(n_plot).reset_index(drop=True)
+# laps are resampled to this many points along the track before drawing (None = every sample)
+max_points = 2000 if fast_render else None
 
-telemetry_list = []
-corners_list = []
-speeds_all = []
+sel_top = top_candidates[["year", "name"]].head(n_plot)
 
-with st.spinner("Loading telemetry…"):
-    for _, r in sel_top.iterrows():
-        year, gp = int(r["year"]), str(r["name"])
-        if year < 2018:
-            telemetry_list.append(None); corners_list.append(None)
-            continue
-        tel, corners = _get_fastest_lap_telemetry(year, gp, "R", driver_code)
+# FastF1 has no telemetry before 2018: drop those races up front instead of fetching placeholders
+n_pre_2018 = int((sel_top["year"] < 2018).sum())
+sel_top = sel_top[sel_top["year"] >= 2018].reset_index(drop=True)
+if n_pre_2018:
+    st.info(f"Skipping {n_pre_2018} race(s) before 2018 (telemetry not available).")
+if sel_top.empty:
+    st.stop()
+
+def _fetch(race):
+    year, gp = race
+    return _cached_tel(year, gp, "R", driver_code)
+
+def _load_telemetry(races):
+    """Telemetry/corners per race (in order) plus the speed range over all laps."""
+    telemetry_list, corners_list = [], []
+    spd_min, spd_max = float("inf"), float("-inf")  # running speed range over all fetched laps
+    # fetches are I/O bound: run them in threads, map() keeps sel_top order
+    with ThreadPoolExecutor(max_workers=min(8, len(races))) as pool:
+        fetched = list(pool.map(_fetch, races))
+    for tel, corners in fetched:
         telemetry_list.append(tel)
         corners_list.append(corners)
         if tel is not None and not tel.empty and "Speed" in tel.columns:
-            speeds_all.append(tel["Speed"].to_numpy(dtype=float))
-
-if normalize_scale and speeds_all:
-    all_speeds = np.concatenate(speeds_all)
-    vmin_glob, vmax_glob = float(np.nanmin(all_speeds)), float(np.nanmax(all_speeds))
+            spd = tel["Speed"].to_numpy(dtype=np.float32)
+            spd_min = min(spd_min, float(np.nanmin(spd)))
+            spd_max = max(spd_max, float(np.nanmax(spd)))
+    return telemetry_list, corners_list, spd_min, spd_max
+
+# Only refetch when the driver or race selection changes; cosmetic widgets
+# (colormap, width, layout, ...) rerender from the telemetry kept in session_state
+races = [(int(r["year"]), str(r["name"])) for _, r in sel_top.iterrows()]
+data_key = (selected_driver, driver_code, tuple(races))
+loaded = st.session_state.get("plots_telemetry")
+if loaded is None or loaded[0] != data_key:
+    with st.spinner("Loading telemetry…"):
+        loaded = (data_key, _load_telemetry(races))
+    st.session_state["plots_telemetry"] = loaded
+telemetry_list, corners_list, spd_min, spd_max = loaded[1]
+has_speeds = spd_min <= spd_max
+
+if normalize_scale and has_speeds:
+    vmin_glob, vmax_glob = spd_min, spd_max
 else:
     vmin_glob = vmax_glob = None
 
 if layout == "One per race":
     cols = st.columns(2)
-    figs = []
+    last_fig = None  # kept open for the PNG download, every other figure is closed once shown
     for i, r in sel_top.iterrows():
         year, gp = int(r["year"]), str(r["name"])
         tel = telemetry_list[i]
         cor = corners_list[i]
         if tel is None or tel.empty:
             continue
-        fig = plot_speedmap(year, gp, "R", driver_code,
-                            cmap=cmap_name, lw=lw,
-                            normalize=(vmin_glob, vmax_glob) if vmin_glob is not None else None,
-                            annotate_corners=annotate)
-        figs.append(fig)
+        # draw from the telemetry fetched above (plot_speedmap would load it again)
+        fig = plot_speedmap_from_telemetry(tel, title=f"{driver_code} – {gp} {year} (R)",
+                                           cmap=cmap_name, lw=lw, vmin=vmin_glob, vmax=vmax_glob,
+                                           corners=cor, annotate_corners=annotate, max_points=max_points)
         with cols[i % 2]:
             st.pyplot(fig, clear_figure=False)
+        if last_fig is not None:
+            plt.close(last_fig)
+        last_fig = fig
 
-    if figs:
+    if last_fig is not None:
         out = io.BytesIO()
-        figs[-1].savefig(out, format="png", dpi=200, bbox_inches="tight")
+        last_fig.savefig(out, format="png", dpi=200, bbox_inches="tight")
+        plt.close(last_fig)
         st.download_button(
             "Download last figure as PNG",
             data=out.getvalue(),
@@ -94,10 +136,10 @@ else:
         x = tel["X"].to_numpy(dtype=float)
         y = tel["Y"].to_numpy(dtype=float)
         s = tel["Speed"].to_numpy(dtype=float)
-        points = np.array([x, y]).T.reshape(-1, 1, 2)
-        segs = np.concatenate([points[:-1], points[1:]], axis=1)
-
-        lc = LineCollection(segs, array=s[:-1], cmap=cmap_name, linewidths=lw, alpha=0.9)
+        if max_points is not None:
+            x, y, s = _resample_by_arclength(x, y, s, max_points)
+        lc = LineCollection(_line_segments(x, y), array=s[:-1].astype(np.float32, copy=False),
+                            cmap=cmap_name, linewidths=lw, alpha=0.9)
         if vmin_glob is not None and vmax_glob is not None:
             lc.set_clim(vmin_glob, vmax_glob)
         ax.add_collection(lc)
@@ -111,9 +153,8 @@ else:
     mappable = plt.cm.ScalarMappable(cmap=cmap_name)
     if vmin_glob is not None and vmax_glob is not None:
         mappable.set_clim(vmin_glob, vmax_glob)
-    else:
-        if speeds_all:
-            mappable.set_clim(float(np.nanmin(all_speeds)), float(np.nanmax(all_speeds)))
+    elif has_speeds:
+        mappable.set_clim(spd_min, spd_max)
     cb = plt.colorbar(mappable, ax=ax, fraction=0.046, pad=0.04)
     cb.set_label("Speed (km/h)")
 
@@ -121,6 +162,7 @@ else:
 
     out = io.BytesIO()
     fig.savefig(out, format="png", dpi=200, bbox_inches="tight")
+    plt.close(fig)
     st.download_button(
         "Download overlay figure as PNG",
         data=out.getvalue(),